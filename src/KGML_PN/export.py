@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import shutil
+import subprocess
+from multiprocessing import Pool
+
+# Internal imports
+from KGML_PN.pathway import Pathway
+from KGML_PN.ui import update_plot
+
+# External imports
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+# Per-process rendering state, filled in once by `_init_worker`.
+_WORKER = {}
+
+
+def record_trajectory(pw: Pathway, n_steps: int) -> list[dict]:
+    """
+    Steps the pathway `n_steps` times and records the state before every step and after the last one.
+    Each frame only holds what `update_plot` needs: the token count and knockout flag of every node.
+    """
+
+    frames = [snapshot(pw)]
+    for _ in range(n_steps):
+        pw.step()
+        frames.append(snapshot(pw))
+    return frames
+
+
+def snapshot(pw: Pathway) -> dict:
+    """ Returns the drawable state of the pathway as a small, picklable frame. """
+
+    return dict(
+        tokens = {node.id: node.tokens for node in pw.nodes.values() if node.tokens},
+        knockouts = {node.id for node in pw.nodes.values() if node.knockout},
+    )
+
+
+def export_frames(pw: Pathway, frames: list[dict], output: str, set_groups: bool = False,
+                  workers: int | None = None, fps: int = 10, dpi: int = 100,
+                  figsize: tuple[float, float] = (16, 9), verbose: bool = False) -> None:
+    """
+    Renders the recorded frames headlessly in a process pool and writes them to `output`.
+
+    If `output` is a directory, or a path without a file extension (created if missing),
+    the frames are written as a numbered PNG sequence (frame_00000.png, ...). A path with
+    a file extension is treated as a video file: the frames are piped in order into a
+    local ffmpeg encoder at `fps` frames per second.
+    Every worker builds a single Agg figure once and redraws it for each of its frames.
+    """
+
+    encode = not os.path.isdir(output) and os.path.splitext(output)[1] != ''
+    if encode:
+        assert shutil.which('ffmpeg') is not None, \
+            f'ffmpeg was not found on the PATH; pass an existing directory instead of {output} to export an image sequence.'
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(frames) // (workers * 4))
+    jobs = [(i, frame, None if encode else output) for i, frame in enumerate(frames)]
+
+    with Pool(workers, initializer=_init_worker, initargs=(pw, set_groups, figsize, dpi)) as pool:
+        # Start the encoder only after the workers are forked, so they never hold its stdin open.
+        encoder = _start_encoder(output, fps) if encode else None
+        try:
+            # imap keeps the frame order, which the encoder relies on.
+            for done, png in enumerate(pool.imap(_render_frame, jobs, chunksize=chunksize), start=1):
+                if encoder: encoder.stdin.write(png)
+                if verbose: print(f'\rExported {done}/{len(frames)} frames', end='', flush=True)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early, its exit code is reported below.
+        finally:
+            if encoder: _stop_encoder(encoder)
+
+    if verbose: print()
+
+    if encoder:
+        assert encoder.returncode == 0, \
+            f'ffmpeg exited with code {encoder.returncode} while writing {output}'
+    return
+
+
+def _start_encoder(output: str, fps: int) -> subprocess.Popen:
+    """ Starts an ffmpeg process that encodes the PNG frames written to its stdin into `output`. """
+
+    return subprocess.Popen(
+        ['ffmpeg', '-y', '-loglevel', 'error',
+         '-f', 'image2pipe', '-framerate', str(fps), '-i', '-',
+         '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',  # yuv420p needs even frame dimensions.
+         '-c:v', 'libx264', '-pix_fmt', 'yuv420p', output],
+        stdin=subprocess.PIPE,
+    )
+
+
+def _stop_encoder(encoder: subprocess.Popen) -> None:
+    """ Signals the end of the stream to ffmpeg and waits for it to exit. """
+
+    try:
+        encoder.stdin.close()
+    except BrokenPipeError:
+        pass  # ffmpeg already exited, the caller checks its exit code.
+    encoder.wait()
+    return
+
+
+def _init_worker(pw: Pathway, set_groups: bool, figsize: tuple[float, float], dpi: int) -> None:
+    """ Builds the figure a worker process reuses for all of its frames. """
+
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    _WORKER.update(pw=pw, set_groups=set_groups, figure=figure, ax=figure.add_subplot(111))
+    return
+
+
+def _render_frame(job: tuple[int, dict, str | None]) -> bytes | None:
+    """ Draws a single frame, writes it to the sequence directory if given, otherwise returns the PNG bytes. """
+
+    i, frame, directory = job
+    pw = _WORKER['pw']
+    for node in pw.nodes.values():
+        node.tokens = frame['tokens'].get(node.id, 0)
+        node.knockout = node.id in frame['knockouts']
+
+    update_plot(_WORKER['ax'], pw, _WORKER['set_groups'])
+
+    if directory is not None:
+        _WORKER['figure'].savefig(os.path.join(directory, f'frame_{i:05d}.png'), format='png')
+        return None
+
+    buffer = io.BytesIO()
+    _WORKER['figure'].savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def main() -> None:
+    """ Entry point for exporting a simulation run without opening the UI. """
+
+    parser = argparse.ArgumentParser(description='Export a simulated KEGG Petri Net as an image sequence or video.')
+    parser.add_argument('filename', type=str, help='Path to the KEGG pathway xml file.')
+    parser.add_argument('output', type=str, help='Directory for a PNG sequence, or a video file path such as out.mp4 (requires ffmpeg).')
+    parser.add_argument('-n', '--steps', type=int, default=100, help='Number of simulation steps to record.')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Number of render processes (default: all cores).')
+    parser.add_argument('-g', '--groups', action='store_true', help='Draw the node groups.')
+    parser.add_argument('--fps', type=int, default=10, help='Frame rate of the encoded video.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Report export progress.')
+    args = parser.parse_args()
+
+    pw = Pathway(args.filename)
+    initial_marking = {
+        60: 10,  # TLR1
+        58: 3,   # TLR3
+        64: 7,   # TLR4
+        57: 2    # TLR5
+    }
+    pw.set_initial_marking(initial_marking)
+
+    frames = record_trajectory(pw, args.steps)
+    export_frames(pw, frames, args.output, set_groups=args.groups,
+                  workers=args.workers, fps=args.fps, verbose=args.verbose)
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import os
 
 from KGML_PN.pathway import Pathway
+from KGML_PN.export import record_trajectory, snapshot, export_frames
 import KGML_PN as PN
 
 # Load the test data
@@ -24,3 +25,50 @@ def test_pathway_groups(pathway):
 def test_pathway_transitions(pathway):
 
     assert len(pathway.transitions) > 0
+
+# Test the headless frame exporter
+def test_record_trajectory(pathway):
+    pathway.set_initial_marking({60: 10, 58: 3})
+    frames = record_trajectory(pathway, 3)
+    assert len(frames) == 4
+    assert frames[0]['tokens'] == {60: 10, 58: 3}
+
+def test_export_image_sequence(pathway, tmp_path):
+    pathway.set_initial_marking({60: 10, 58: 3})
+    frames = record_trajectory(pathway, 3)
+    output = tmp_path / 'frames'  # does not exist yet, so it is created
+    export_frames(pathway, frames, str(output), workers=2, figsize=(4, 3), dpi=50)
+    assert sorted(os.listdir(output)) == [f'frame_{i:05d}.png' for i in range(4)]
+
+def test_export_frames_differ(pathway, tmp_path):
+    first = snapshot(pathway)
+    pathway.set_initial_marking({60: 10, 58: 3})
+    second = snapshot(pathway)
+    export_frames(pathway, [first, second, first], str(tmp_path), workers=2, figsize=(4, 3), dpi=50)
+    images = [(tmp_path / f'frame_{i:05d}.png').read_bytes() for i in range(3)]
+    assert images[0] != images[1]
+    assert images[0] == images[2]
+
+def stub_ffmpeg(monkeypatch, tmp_path, script):
+    """ Puts a fake ffmpeg executable running `script` in front of the PATH. """
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / 'ffmpeg'
+    ffmpeg.write_text(f'#!/bin/sh\n{script}\n')
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv('PATH', f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+
+def test_export_video(pathway, tmp_path, monkeypatch):
+    # The stub copies the piped frames to the output file, which is its last argument.
+    stub_ffmpeg(monkeypatch, tmp_path, 'for last; do :; done; cat > "$last"')
+    pathway.set_initial_marking({60: 10, 58: 3})
+    frames = record_trajectory(pathway, 3)
+    output = tmp_path / 'out.mp4'
+    export_frames(pathway, frames, str(output), workers=2, figsize=(4, 3), dpi=50)
+    assert output.read_bytes().count(b'\x89PNG') == len(frames)
+
+def test_export_video_ffmpeg_fails(pathway, tmp_path, monkeypatch):
+    stub_ffmpeg(monkeypatch, tmp_path, 'exit 1')
+    frames = record_trajectory(pathway, 50)
+    with pytest.raises(AssertionError, match='ffmpeg exited with code 1'):
+        export_frames(pathway, frames, str(tmp_path / 'out.mp4'), workers=2, figsize=(4, 3), dpi=50)